@@ -1,13 +1,16 @@
 import streamlit as st
-import spacy
 import language_tool_python
-from sentence_transformers import SentenceTransformer, util
-import numpy as np
-import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
+import io
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
+from html import escape
+from pathlib import Path
+
+import rubric
 
 # --- 1. CONFIGURATION & STYLE ---
 st.set_page_config(
@@ -17,292 +20,234 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for a "Product-Like" feel
-st.markdown("""
-    <style>
-    .main { background-color: #f8f9fa; }
-    h1 { color: #2c3e50; font-family: 'Helvetica Neue', sans-serif; }
-    .metric-card {
-        background-color: white;
-        padding: 20px;
-        border-radius: 10px;
-        box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        text-align: center;
-    }
-    .chip-found {
-        background-color: #d4edda;
-        color: #155724;
-        padding: 5px 10px;
-        border-radius: 15px;
-        margin: 2px;
-        display: inline-block;
-        font-size: 0.9em;
-        border: 1px solid #c3e6cb;
-    }
-    .chip-missing {
-        background-color: #f8d7da;
-        color: #721c24;
-        padding: 5px 10px;
-        border-radius: 15px;
-        margin: 2px;
-        display: inline-block;
-        font-size: 0.9em;
-        border: 1px solid #f5c6cb;
-    }
-    .stButton>button {
-        width: 100%;
-        border-radius: 8px;
-        font-weight: bold;
-    }
-    </style>
-""", unsafe_allow_html=True)
+# Custom CSS for a "Product-Like" feel. The file is read once, but the <style> block is still
+# sent on every rerun; fonts, radii and background colors live in .streamlit/config.toml instead.
+@st.cache_data
+def load_css():
+    return (Path(__file__).parent / "assets" / "styles.css").read_text(encoding="utf-8")
 
-# --- 2. LOAD AI MODELS (CACHED) ---
-@st.cache_resource
-def load_nlp():
-    try:
-        return spacy.load("en_core_web_sm")
-    except OSError:
-        from spacy.cli import download
-        download("en_core_web_sm")
-        return spacy.load("en_core_web_sm")
+st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
 
-@st.cache_resource
-def load_similarity_model():
-    return SentenceTransformer('all-MiniLM-L6-v2')
+# --- 2. LOAD AI MODELS (CACHED) ---
+# Server-side settings for the LanguageTool HTTP server (result + pipeline caching)
+LT_SERVER_CONFIG = {'cacheSize': 1000, 'pipelineCaching': True, 'maxCheckThreads': 8}
 
-@st.cache_resource
+@st.cache_resource(ttl=None, max_entries=1)
 def load_grammar_tool():
+    # language_tool_python runs LanguageTool as a local HTTP server; cache_resource keeps
+    # that one JVM alive across reruns. LANGUAGETOOL_SERVER points at an already running one.
     try:
-        return language_tool_python.LanguageTool('en-US')
+        remote_server = os.environ.get('LANGUAGETOOL_SERVER')
+        if remote_server:
+            return language_tool_python.LanguageTool('en-US', remote_server=remote_server)
+        return language_tool_python.LanguageTool('en-US', config=LT_SERVER_CONFIG)
     except Exception as e:
         return None
 
-# --- 3. STRICT RUBRIC LOGIC ---
+# Semantic keyword matching pulls in torch + MiniLM (~90MB), so it is opt-in
+ENABLE_SEMANTIC_SCORING = os.environ.get('ENABLE_SEMANTIC_SCORING') == '1'
+# Optional int8-quantized ONNX export of MiniLM, used instead of torch on CPU-only hosts
+SEMANTIC_ONNX_MODEL = os.environ.get('SEMANTIC_ONNX_MODEL')
 
-def analyze_content_strict(text):
+class OnnxSentenceEncoder:
     """
-    Weightage: 40% Total
-    - Salutation: 5%
-    - Keywords: 30%
-    - Flow: 5%
+    Drop-in for SentenceTransformer.encode backed by ONNX Runtime.
+    Mean-pools token embeddings over the attention mask; always returns a tensor.
     """
-    text_lower = text.lower()
-    
-    # 1. Salutation (5 pts)
-    salutations = ['hello', 'hi', 'good morning', 'good afternoon', 'good evening', 'namaste']
-    has_salutation = any(s in text_lower for s in salutations)
-    score_salutation = 5 if has_salutation else 0
-
-    # 2. Flow (5 pts) - Logic: Salutation -> Name -> Closing
-    # Find indices of key components
+    # Same truncation as SentenceTransformer('all-MiniLM-L6-v2').max_seq_length
+    max_seq_length = 256
+
+    def __init__(self, path):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+        self.model = ORTModelForFeatureExtraction.from_pretrained(path)
+        try:
+            self.tokenizer = AutoTokenizer.from_pretrained(path)
+        except (OSError, ValueError):
+            # Quantized exports don't always carry tokenizer files; the tokenizer is unchanged anyway
+            self.tokenizer = AutoTokenizer.from_pretrained('sentence-transformers/all-MiniLM-L6-v2')
+
+    def encode(self, sentences, batch_size=64, convert_to_tensor=True, normalize_embeddings=False):
+        import torch
+        batches = []
+        for i in range(0, len(sentences), batch_size):
+            inputs = self.tokenizer(sentences[i:i + batch_size], padding=True, truncation=True, max_length=self.max_seq_length, return_tensors='pt')
+            token_embeddings = self.model(**inputs).last_hidden_state
+            mask = inputs['attention_mask'].unsqueeze(-1).to(token_embeddings.dtype)
+            batches.append((token_embeddings * mask).sum(1) / mask.sum(1).clamp(min=1e-9))
+        embeddings = torch.cat(batches)
+        if normalize_embeddings:
+            embeddings = torch.nn.functional.normalize(embeddings, p=2, dim=1)
+        return embeddings
+
+@st.cache_resource(ttl=None, max_entries=1)
+def load_similarity_model():
+    # Returns None when the model can't be loaded; the None is cached, so a broken
+    # install is tried once and semantic scoring is simply skipped afterwards
     try:
-        idx_salutation = min([text_lower.find(s) for s in salutations if s in text_lower]) if has_salutation else -1
-        
-        name_indicators = ['my name', 'myself', 'i am']
-        idx_name = -1
-        for n in name_indicators:
-            if n in text_lower:
-                idx_name = text_lower.find(n)
-                break
-        
-        closing_indicators = ['thank', 'that\'s all', 'listening']
-        idx_closing = -1
-        for c in closing_indicators:
-            if c in text_lower:
-                idx_closing = text_lower.find(c)
-                break
-        
-        # Logic: Salutation must come before Name, Name must come before Closing
-        is_flow_correct = False
-        if idx_salutation != -1 and idx_name != -1 and idx_closing != -1:
-            if idx_salutation < idx_name < idx_closing:
-                is_flow_correct = True
-        elif idx_name != -1 and idx_closing != -1:
-             if idx_name < idx_closing:
-                 is_flow_correct = True # Partial credit logic if salutation missing but flow ok
-        
-        score_flow = 5 if is_flow_correct else 0
-    except:
-        score_flow = 0 # Fallback
-
-    # 3. Keywords (30 pts) - Derived from Excel List
-    required_keywords = {
-        "Name": ['name', 'myself', 'i am'],
-        "Age": ['years old', 'age'],
-        "Class/School": ['class', 'grade', 'studying', 'school', 'college'],
-        "Family": ['family', 'mother', 'father', 'parents', 'siblings', 'brother', 'sister'],
-        "Hobbies": ['hobby', 'hobbies', 'playing', 'reading', 'dancing', 'singing', 'drawing', 'interest', 'enjoy'],
-        "Goal": ['goal', 'aim', 'ambition', 'become a', 'want to be'],
-        "Unique Point": ['fact', 'special', 'unique', 'don\'t know about me']
-    }
-    
-    found_sections = []
-    missing_sections = []
-    
-    for category, keywords in required_keywords.items():
-        if any(k in text_lower for k in keywords):
-            found_sections.append(category)
+        import torch
+        if SEMANTIC_ONNX_MODEL and not torch.cuda.is_available():
+            model = OnnxSentenceEncoder(SEMANTIC_ONNX_MODEL)
         else:
-            missing_sections.append(category)
-    
-    # Calculate Score: (Found / Total Categories) * 30
-    total_categories = len(required_keywords)
-    score_keywords = (len(found_sections) / total_categories) * 30
-
-    total_content_score = score_salutation + score_flow + score_keywords
-
-    return {
-        "total_score": total_content_score,
-        "breakdown": {
-            "Salutation (5)": score_salutation,
-            "Flow (5)": score_flow,
-            "Keywords (30)": round(score_keywords, 1)
-        },
-        "found_sections": found_sections,
-        "missing_sections": missing_sections,
-        "is_flow_correct": is_flow_correct
-    }
+            from sentence_transformers import SentenceTransformer
+            device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            model = SentenceTransformer('all-MiniLM-L6-v2', device=device)
+            if device == 'cpu':
+                try:
+                    import intel_extension_for_pytorch as ipex
+                    model = ipex.optimize(model.eval(), dtype=torch.bfloat16)
+                    model.ipex_bf16 = True
+                except ImportError:
+                    pass # non-Intel deployments stay on FP32
+        # Rubric prompts encoded once and kept as a (K, D) tensor on the model's device
+        prompt_embeddings = encode_sentences(model, list(RUBRIC_PROMPTS.values()), convert_to_tensor=True, normalize_embeddings=True)
+        return model, prompt_embeddings
+    except Exception as e:
+        return None
+
+def encode_sentences(model, sentences, **kwargs):
+    # IPEX-optimized models run under bf16 autocast (AMX tiles on 4th-gen Xeon)
+    if getattr(model, 'ipex_bf16', False):
+        import torch
+        with torch.no_grad(), torch.autocast('cpu', dtype=torch.bfloat16):
+            return model.encode(sentences, **kwargs).float()
+    return model.encode(sentences, **kwargs)
 
-def analyze_speech_rate_strict(text, duration):
+# --- 3. STRICT RUBRIC LOGIC ---
+# Scoring lives in rubric.py; this section adds caching, LanguageTool and semantic matching.
+
+# Reference prompts per keyword category for semantic matching
+RUBRIC_PROMPTS = {
+    "Name": "introduce your name",
+    "Age": "state your age",
+    "Class/School": "which class and school you study in",
+    "Family": "talk about your family members",
+    "Hobbies": "describe your hobbies and interests",
+    "Goal": "your goal or ambition for the future",
+    "Unique Point": "a unique or special fact about yourself"
+}
+SEMANTIC_THRESHOLD = 0.5
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+@st.cache_resource(ttl=None, max_entries=1)
+def build_automaton():
+    return rubric.build_automaton()
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def analyze_all(text, duration):
     """
-    Weightage: 10%
-    - Ideal (111-140 WPM): 10
-    - Slow (81-110 WPM): 6
-    - Too Slow (<80 WPM): 2
-    - Fast (>140 WPM): 6 (Assumed based on Slow penalty)
+    Scores a transcript with rubric.analyze using the cached automaton,
+    LanguageTool and (if enabled) semantic matching. Cached on
+    (text, duration) so reruns skip LanguageTool entirely.
     """
-    if duration <= 0: return {"score": 0, "wpm": 0, "feedback": "Invalid"}
-    
-    words = len(text.split())
-    minutes = duration / 60
-    wpm = words / minutes
-    
-    if 111 <= wpm <= 140:
-        score = 10
-        feedback = "Ideal Pace (111-140 WPM)"
-    elif 81 <= wpm <= 110:
-        score = 6
-        feedback = "Slow (81-110 WPM)"
-    elif wpm < 80:
-        score = 2
-        feedback = "Too Slow (<80 WPM)"
-    else:
-        # > 140 WPM
-        score = 6
-        feedback = "Fast (>140 WPM)"
-        
-    return {"score": score, "wpm": int(wpm), "feedback": feedback}
+    tool = load_grammar_tool()
+    return rubric.analyze(
+        text, duration, build_automaton(),
+        check_grammar=partial(_check_grammar, tool) if tool else None,
+        semantic_sections=find_semantic_sections(text) if ENABLE_SEMANTIC_SCORING else ()
+    )
 
-def analyze_grammar_strict(text):
+def find_semantic_sections(text):
     """
-    Weightage: 20% Total
-    - Grammar Errors: 10%
-      Formula: 1 - min(errors per 100 words / 10, 1) -> Scaled to 10
-    - Vocabulary (TTR): 10%
-      >0.9: 10 | 0.7-0.89: 8 | 0.5-0.69: 6 | 0.3-0.49: 4 | <0.3: 2
+    Keyword categories whose rubric prompt is close to any transcript sentence.
+    All sentences are encoded in one batched call and matched against the
+    precomputed prompt embeddings.
     """
-    # 1. Grammar Logic
-    tool = load_grammar_tool()
-    words = text.split()
-    word_count = len(words)
-    
-    if not tool or word_count == 0:
-        score_grammar = 10
-        matches = []
-        error_count = 0
-    else:
-        matches = tool.check(text)
-        error_count = len(matches)
-        # Formula from Excel: 1 - min(errors_per_100/10, 1)
-        errors_per_100 = (error_count / word_count) * 100
-        calc_val = min(errors_per_100 / 10, 1)
-        score_grammar = (1 - calc_val) * 10 # Scale 0-1 to 0-10
-
-    # 2. Vocabulary Logic (TTR)
-    text_lower = text.lower()
-    words_lower = text_lower.split()
-    if not words_lower:
-        ttr = 0
-    else:
-        ttr = len(set(words_lower)) / len(words_lower)
-        
-    if ttr >= 0.9: score_vocab = 10
-    elif ttr >= 0.7: score_vocab = 8
-    elif ttr >= 0.5: score_vocab = 6
-    elif ttr >= 0.3: score_vocab = 4
-    else: score_vocab = 2
-    
-    return {
-        "total_score": score_grammar + score_vocab,
-        "grammar_score": round(score_grammar, 1),
-        "vocab_score": score_vocab,
-        "error_count": error_count,
-        "matches": matches,
-        "ttr": round(ttr, 2)
-    }
+    loaded = load_similarity_model()
+    if loaded is None:
+        return set() # model unavailable: keyword matching only
+    model, prompt_embeddings = loaded
 
-def analyze_clarity_strict(text):
+    from sentence_transformers import util
+
+    sentences = [s for s in _SENTENCE_SPLIT_RE.split(text.strip()) if s]
+    if not sentences:
+        return set()
+
+    sentence_embeddings = encode_sentences(model, sentences, batch_size=64, convert_to_tensor=True, normalize_embeddings=True)
+    hits = util.semantic_search(sentence_embeddings, prompt_embeddings, top_k=len(RUBRIC_PROMPTS))
+
+    categories = list(RUBRIC_PROMPTS)
+    return {categories[h['corpus_id']] for sentence_hits in hits for h in sentence_hits if h['score'] >= SEMANTIC_THRESHOLD}
+
+def _check_grammar(tool, text):
+    # Plain (message, context) tuples so the result can be pickled by st.cache_data
+    return [(m.message, m.context) for m in tool.check(text)]
+
+def analyze_grammar_batch(texts):
     """
-    Weightage: 30% (Assumed Remaining Weight)
-    Metric: Filler Word Rate
-    Formula: (Filler Count / Total Words) * 100
-    List from Excel: um, uh, like, you know, so, actually, basically, right, i mean, well, kinda, sort of, okay, hmm, ah
+    Grammar matches for several transcripts, in input order.
+    Requests run concurrently; the LanguageTool server checks up to
+    maxCheckThreads of them in parallel.
     """
-    fillers = ['um', 'uh', 'like', 'you know', 'so', 'actually', 'basically', 'right', 'i mean', 'well', 'kinda', 'sort of', 'okay', 'hmm', 'ah']
-    words = text.lower().split()
-    total_words = len(words)
-    
-    if total_words == 0:
-        return {"score": 30, "filler_percentage": 0, "filler_count": 0}
-    
-    # Exact match count
-    filler_count = 0
-    for w in words:
-        # Strip punctuation for better matching
-        clean_w = re.sub(r'[^\w\s]', '', w)
-        if clean_w in fillers:
-            filler_count += 1
-            
-    filler_rate = (filler_count / total_words) * 100
-    
-    # Bins (Assumed standard as Excel snippet cut off)
-    # Scaling 10 point scale to 30 points (x3)
-    if filler_rate < 2: 
-        raw_score = 10
-    elif filler_rate < 5: 
-        raw_score = 8
-    elif filler_rate < 9: 
-        raw_score = 6
-    elif filler_rate < 12: 
-        raw_score = 4
-    else: 
-        raw_score = 2
-        
-    final_score = raw_score * 3 # Scale to 30%
-    
-    return {
-        "score": final_score,
-        "filler_rate": round(filler_rate, 2),
-        "filler_count": filler_count
+    tool = load_grammar_tool()
+    if not tool:
+        return [[] for _ in texts]
+    with ThreadPoolExecutor(max_workers=LT_SERVER_CONFIG['maxCheckThreads']) as ex:
+        return list(ex.map(lambda t: _check_grammar(tool, t), texts))
+
+# Static gauge spec built once; only value, title and bar color change per call
+_GAUGE_SPEC = dict(
+    mode = "gauge+number",
+    gauge = {
+        'axis': {'range': [0, 100]},
+        'steps' : [
+            {'range': [0, 50], 'color': "lightgray"},
+            {'range': [50, 80], 'color': "gray"}],
     }
+)
+_GAUGE_MARGIN = dict(l=10, r=10, t=40, b=10)
+
+def _gauge_color(score):
+    return "#4CAF50" if score > 80 else "#FFC107" if score > 50 else "#FF5252"
 
 def create_gauge_chart(score, title):
-    fig = go.Figure(go.Indicator(
-        mode = "gauge+number",
-        value = score,
-        title = {'text': title},
-        gauge = {
-            'axis': {'range': [0, 100]},
-            'bar': {'color': "#4CAF50" if score > 80 else "#FFC107" if score > 50 else "#FF5252"},
-            'steps' : [
-                {'range': [0, 50], 'color': "lightgray"},
-                {'range': [50, 80], 'color': "gray"}],
-        }
-    ))
-    fig.update_layout(height=250, margin=dict(l=10, r=10, t=40, b=10))
+    spec = {**_GAUGE_SPEC, 'value': score, 'title': {'text': title}}
+    spec['gauge'] = {**_GAUGE_SPEC['gauge'], 'bar': {'color': _gauge_color(score)}}
+    fig = go.Figure(go.Indicator(**spec))
+    fig.update_layout(height=250, margin=_GAUGE_MARGIN)
     return fig
 
+def build_report(final_score, content, grammar, speech, clarity):
+    """Plain-text assessment report for the download button."""
+    buf = io.StringIO()
+    buf.writelines([
+        "NIRMAAN AI COMMUNICATION COACH - ASSESSMENT REPORT\n",
+        f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+        "--------------------------------------------------\n",
+        "\n",
+        f"OVERALL SCORE: {int(final_score)} / 100\n",
+        "\n",
+        f"1. CONTENT & STRUCTURE (Score: {content['total_score']}/40)\n",
+        f"   - Salutation: {'Present' if content['breakdown']['Salutation (5)'] > 0 else 'Missing'}\n",
+        f"   - Flow: {'Correct' if content['is_flow_correct'] else 'Needs Improvement'}\n",
+        f"   - Keywords Found: {', '.join(content['found_sections'])}\n",
+        f"   - Keywords Missing: {', '.join(content['missing_sections'])}\n",
+        "\n",
+        f"2. LANGUAGE & GRAMMAR (Score: {grammar['total_score']}/20)\n",
+        f"   - Grammar Errors: {grammar['error_count']}\n",
+        f"   - Vocabulary Diversity (TTR): {grammar['ttr']}\n",
+        "\n",
+        f"3. SPEECH RATE (Score: {speech['score']}/10)\n",
+        f"   - Speed: {speech['wpm']} WPM\n",
+        f"   - Verdict: {speech['feedback']}\n",
+        "\n",
+        f"4. CLARITY & FLOW (Score: {clarity['score']}/30)\n",
+        f"   - Filler Word Rate: {clarity['filler_rate']}%\n",
+        f"   - Filler Words Found: {clarity['filler_count']}\n",
+        "\n",
+        "--------------------------------------------------\n",
+        "Generated by Nirmaan AI Coach\n",
+    ])
+    return buf.getvalue()
+
+# Pre-warm cached resources at boot so the first Analyze click doesn't pay JVM/model startup.
+# Both loaders return None on failure (e.g. no Java, no torch), so the app still runs in degraded mode.
+load_grammar_tool()
+build_automaton()
+if ENABLE_SEMANTIC_SCORING:
+    load_similarity_model()
+
 # --- 4. APP LAYOUT ---
 
 st.title("🎙️ AI Communication Coach")
@@ -323,21 +268,25 @@ My favorite subject is science because it is very interesting. Through science I
 Thank you for listening."""
         st.session_state['duration'] = 52
     
-    transcript = st.text_area("Paste Transcript:", value=st.session_state.get('transcript_text', ""), height=300)
-    duration = st.number_input("Speech Duration (seconds):", value=st.session_state.get('duration', 60), min_value=10)
-    
-    st.markdown("---")
-    analyze_btn = st.button("🚀 Analyze Now", type="primary")
+    # Inputs live in a form so typing doesn't rerun the script; only Analyze submits.
+    # Load Case Study stays outside since it must rerun immediately to fill the inputs.
+    with st.form("input_form"):
+        transcript = st.text_area("Paste Transcript:", value=st.session_state.get('transcript_text', ""), height=300)
+        duration = st.number_input("Speech Duration (seconds):", value=st.session_state.get('duration', 60), min_value=10)
+        
+        st.markdown("---")
+        analyze_btn = st.form_submit_button("🚀 Analyze Now", type="primary")
 
 # Main Logic
 if analyze_btn and transcript:
     with st.spinner("🤖 Applying Nirmaan Rubric Logic..."):
         
         # 1. Run Analysis
-        content = analyze_content_strict(transcript)
-        grammar = analyze_grammar_strict(transcript)
-        speech = analyze_speech_rate_strict(transcript, duration)
-        clarity = analyze_clarity_strict(transcript)
+        results = analyze_all(transcript, duration)
+        content = results['content']
+        grammar = results['grammar']
+        speech = results['speech']
+        clarity = results['clarity']
         
         # 2. Calculate Final Score (Simple Sum because we scaled sections to weights)
         final_score = (
@@ -364,13 +313,12 @@ if analyze_btn and transcript:
 
         with col2:
             # Parameter Breakdown Chart
-            df_scores = pd.DataFrame({
-                'Category': ['Content (40%)', 'Grammar & Vocab (20%)', 'Speech Rate (10%)', 'Clarity (30%)'],
-                'Score Achieved': [content['total_score'], grammar['total_score'], speech['score'], clarity['score']],
-                'Max Score': [40, 20, 10, 30]
-            })
-            
-            fig = px.bar(df_scores, x='Category', y=['Score Achieved', 'Max Score'], barmode='group', title="Score Breakdown vs Max Weightage")
+            categories = ['Content (40%)', 'Grammar & Vocab (20%)', 'Speech Rate (10%)', 'Clarity (30%)']
+            fig = go.Figure(data=[
+                go.Bar(name='Score Achieved', x=categories, y=[content['total_score'], grammar['total_score'], speech['score'], clarity['score']]),
+                go.Bar(name='Max Score', x=categories, y=[40, 20, 10, 30])
+            ])
+            fig.update_layout(barmode='group', title="Score Breakdown vs Max Weightage", xaxis_title='Category', yaxis_title='Score')
             st.plotly_chart(fig, use_container_width=True)
 
         st.markdown("---")
@@ -394,10 +342,10 @@ if analyze_btn and transcript:
 
             with c2:
                 st.write("**Keyword Analysis:**")
-                for s in content['found_sections']:
-                    st.markdown(f"<span class='chip-found'>✅ {s}</span>", unsafe_allow_html=True)
-                for s in content['missing_sections']:
-                    st.markdown(f"<span class='chip-missing'>❌ {s}</span>", unsafe_allow_html=True)
+                # One markdown call for all chips instead of one per section
+                chips = [f"<span class='chip-found'>✅ {s}</span>" for s in content['found_sections']]
+                chips += [f"<span class='chip-missing'>❌ {s}</span>" for s in content['missing_sections']]
+                st.markdown("".join(chips), unsafe_allow_html=True)
 
         with t2:
             c1, c2 = st.columns(2)
@@ -405,10 +353,12 @@ if analyze_btn and transcript:
                 st.metric("Grammar Score", f"{grammar['grammar_score']} / 10")
                 st.caption("Formula: 1 - min(errors/10 words, 1)")
                 if grammar['matches']:
-                    for m in grammar['matches']:
-                        # SAFE MODE: No slicing
-                        st.error(f"Issue: {m.message}")
-                        st.caption(f"Context: {m.context}")
+                    # SAFE MODE: No slicing. Escaped, since context echoes the transcript
+                    issues_html = "\n".join(
+                        f"<div class='grammar-issue'>Issue: {escape(message)}<br><small>Context: {escape(context)}</small></div>"
+                        for message, context in grammar['matches']
+                    )
+                    st.markdown(issues_html, unsafe_allow_html=True)
                 else:
                     st.success("No Grammar Errors")
             with c2:
@@ -432,39 +382,10 @@ if analyze_btn and transcript:
             st.header("📄 Download Assessment Report")
             st.write("Click the button below to save a detailed text file of this analysis.")
             
-            # Generate Report Text
-            report_content = f"""
-NIRMAAN AI COMMUNICATION COACH - ASSESSMENT REPORT
-Date: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
---------------------------------------------------
-
-OVERALL SCORE: {int(final_score)} / 100
-
-1. CONTENT & STRUCTURE (Score: {content['total_score']}/40)
-   - Salutation: {'Present' if content['breakdown']['Salutation (5)'] > 0 else 'Missing'}
-   - Flow: {'Correct' if content['is_flow_correct'] else 'Needs Improvement'}
-   - Keywords Found: {', '.join(content['found_sections'])}
-   - Keywords Missing: {', '.join(content['missing_sections'])}
-
-2. LANGUAGE & GRAMMAR (Score: {grammar['total_score']}/20)
-   - Grammar Errors: {grammar['error_count']}
-   - Vocabulary Diversity (TTR): {grammar['ttr']}
-
-3. SPEECH RATE (Score: {speech['score']}/10)
-   - Speed: {speech['wpm']} WPM
-   - Verdict: {speech['feedback']}
-
-4. CLARITY & FLOW (Score: {clarity['score']}/30)
-   - Filler Word Rate: {clarity['filler_rate']}%
-   - Filler Words Found: {clarity['filler_count']}
-
---------------------------------------------------
-Generated by Nirmaan AI Coach
-            """
-            
             st.download_button(
                 label="📥 Download Report (.txt)",
-                data=report_content,
+                # Built lazily, only when the button is clicked
+                data=partial(build_report, final_score, content, grammar, speech, clarity),
                 file_name=f"Assessment_Report_{datetime.now().strftime('%Y%m%d')}.txt",
                 mime="text/plain",
                 type="primary"
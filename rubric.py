@@ -0,0 +1,246 @@
+import ahocorasick
+
+# Strict rubric scoring, free of Streamlit so it can be tested on its own.
+# app.py adds caching, LanguageTool and the optional semantic matcher on top.
+
+# Flow markers, in precedence order for name/closing lookups
+SALUTATIONS = ('hello', 'hi', 'good morning', 'good afternoon', 'good evening', 'namaste')
+NAME_INDICATORS = ('my name', 'myself', 'i am')
+CLOSING_INDICATORS = ('thank', 'that\'s all', 'listening')
+
+# Derived from Excel List
+REQUIRED_KEYWORDS = {
+    "Name": ['name', 'myself', 'i am'],
+    "Age": ['years old', 'age'],
+    "Class/School": ['class', 'grade', 'studying', 'school', 'college'],
+    "Family": ['family', 'mother', 'father', 'parents', 'siblings', 'brother', 'sister'],
+    "Hobbies": ['hobby', 'hobbies', 'playing', 'reading', 'dancing', 'singing', 'drawing', 'interest', 'enjoy'],
+    "Goal": ['goal', 'aim', 'ambition', 'become a', 'want to be'],
+    "Unique Point": ['fact', 'special', 'unique', 'don\'t know about me']
+}
+
+# Filler list from Excel, split into single words and two-word phrases for set lookups
+SINGLE_FILLERS = frozenset(['um', 'uh', 'like', 'so', 'actually', 'basically', 'right', 'well', 'kinda', 'okay', 'hmm', 'ah'])
+MULTI_FILLERS = ['you know', 'i mean', 'sort of']
+_MULTI_FILLER_PAIRS = frozenset(tuple(p.split()) for p in MULTI_FILLERS)
+
+class _NonWordTable(dict):
+    r"""
+    str.translate table that deletes every char re's [^\w\s] would match,
+    Unicode punctuation (…, “ ”) included. Filled lazily per code point.
+    """
+    def __missing__(self, code):
+        ch = chr(code)
+        self[code] = code if ch.isalnum() or ch == '_' or ch.isspace() else None
+        return self[code]
+
+_NON_WORD_TABLE = _NonWordTable()
+
+def build_automaton():
+    # One Aho-Corasick automaton over every salutation/flow/keyword marker
+    automaton = ahocorasick.Automaton()
+    markers = set(SALUTATIONS) | set(NAME_INDICATORS) | set(CLOSING_INDICATORS)
+    for keywords in REQUIRED_KEYWORDS.values():
+        markers.update(keywords)
+    for m in markers:
+        automaton.add_word(m, m)
+    automaton.make_automaton()
+    return automaton
+
+def analyze(text, duration, automaton, check_grammar=None, semantic_sections=()):
+    """
+    Runs every rubric section over a single lowercase/tokenize pass.
+    Returns {"content", "grammar", "speech", "clarity"} with the same
+    sub-dicts the dashboard renders. check_grammar(text) returns
+    (message, context) tuples; None means no grammar checker is available.
+    """
+    text_lower = text.lower()
+    words_lower = text_lower.split()
+    word_count = len(words_lower)
+
+    # Single traversal: unique words (TTR) + fillers on punctuation-stripped tokens
+    unique_words = set()
+    add_unique = unique_words.add # bound once, avoids an attribute lookup per token
+    filler_count = 0
+    prev = None
+    for w in words_lower:
+        add_unique(w)
+        clean_w = w.translate(_NON_WORD_TABLE)
+        if clean_w in SINGLE_FILLERS:
+            filler_count += 1
+        if (prev, clean_w) in _MULTI_FILLER_PAIRS:
+            filler_count += 1
+        # Phrases only count when nothing separates the words ("you, know" is not a filler)
+        prev = clean_w if clean_w and clean_w[-1] == w[-1] else None
+
+    return {
+        "content": score_content(text_lower, automaton, semantic_sections),
+        "grammar": score_grammar(check_grammar(text) if check_grammar and word_count else None, word_count, len(unique_words)),
+        "speech": score_speech_rate(word_count, duration),
+        "clarity": score_clarity(word_count, filler_count),
+    }
+
+def score_content(text_lower, automaton, semantic_sections=()):
+    """
+    Weightage: 40% Total
+    - Salutation: 5%
+    - Keywords: 30%
+    - Flow: 5%
+    """
+    # Single automaton pass: first start index of every marker present in the text
+    first_idx = {}
+    for end, marker in automaton.iter(text_lower):
+        if marker not in first_idx:
+            first_idx[marker] = end - len(marker) + 1
+
+    # 1. Salutation (5 pts)
+    sal_hits = [first_idx[s] for s in SALUTATIONS if s in first_idx]
+    has_salutation = bool(sal_hits)
+    score_salutation = 5 if has_salutation else 0
+
+    # 2. Flow (5 pts) - Logic: Salutation -> Name -> Closing
+    idx_salutation = min(sal_hits) if has_salutation else -1
+    idx_name = next((first_idx[n] for n in NAME_INDICATORS if n in first_idx), -1)
+    idx_closing = next((first_idx[c] for c in CLOSING_INDICATORS if c in first_idx), -1)
+
+    # Logic: Salutation must come before Name, Name must come before Closing
+    is_flow_correct = False
+    if idx_salutation != -1 and idx_name != -1 and idx_closing != -1:
+        if idx_salutation < idx_name < idx_closing:
+            is_flow_correct = True
+    elif idx_name != -1 and idx_closing != -1:
+         if idx_name < idx_closing:
+             is_flow_correct = True # Partial credit logic if salutation missing but flow ok
+
+    score_flow = 5 if is_flow_correct else 0
+
+    # 3. Keywords (30 pts) - substring hit, or semantic match when enabled
+    found_sections = []
+    missing_sections = []
+    
+    for category, keywords in REQUIRED_KEYWORDS.items():
+        if any(k in first_idx for k in keywords) or category in semantic_sections:
+            found_sections.append(category)
+        else:
+            missing_sections.append(category)
+    
+    # Calculate Score: (Found / Total Categories) * 30
+    total_categories = len(REQUIRED_KEYWORDS)
+    score_keywords = (len(found_sections) / total_categories) * 30
+
+    total_content_score = score_salutation + score_flow + score_keywords
+
+    return {
+        "total_score": total_content_score,
+        "breakdown": {
+            "Salutation (5)": score_salutation,
+            "Flow (5)": score_flow,
+            "Keywords (30)": round(score_keywords, 1)
+        },
+        "found_sections": found_sections,
+        "missing_sections": missing_sections,
+        "is_flow_correct": is_flow_correct
+    }
+
+def score_speech_rate(word_count, duration):
+    """
+    Weightage: 10%
+    - Ideal (111-140 WPM): 10
+    - Slow (81-110 WPM): 6
+    - Too Slow (<80 WPM): 2
+    - Fast (>140 WPM): 6 (Assumed based on Slow penalty)
+    """
+    if duration <= 0: return {"score": 0, "wpm": 0, "feedback": "Invalid"}
+    
+    minutes = duration / 60
+    wpm = word_count / minutes
+    
+    if 111 <= wpm <= 140:
+        score = 10
+        feedback = "Ideal Pace (111-140 WPM)"
+    elif 81 <= wpm <= 110:
+        score = 6
+        feedback = "Slow (81-110 WPM)"
+    elif wpm < 80:
+        score = 2
+        feedback = "Too Slow (<80 WPM)"
+    else:
+        # > 140 WPM
+        score = 6
+        feedback = "Fast (>140 WPM)"
+        
+    return {"score": score, "wpm": int(wpm), "feedback": feedback}
+
+def score_grammar(matches, word_count, unique_count):
+    """
+    Weightage: 20% Total
+    - Grammar Errors: 10%
+      Formula: 1 - min(errors per 100 words / 10, 1) -> Scaled to 10
+    - Vocabulary (TTR): 10%
+      >0.9: 10 | 0.7-0.89: 8 | 0.5-0.69: 6 | 0.3-0.49: 4 | <0.3: 2
+    """
+    # 1. Grammar Logic (matches is None when the text wasn't checked)
+    if matches is None:
+        score_grammar = 10
+        matches = []
+        error_count = 0
+    else:
+        error_count = len(matches)
+        # Formula from Excel: 1 - min(errors_per_100/10, 1)
+        errors_per_100 = (error_count / word_count) * 100
+        calc_val = min(errors_per_100 / 10, 1)
+        score_grammar = (1 - calc_val) * 10 # Scale 0-1 to 0-10
+
+    # 2. Vocabulary Logic (TTR)
+    if word_count == 0:
+        ttr = 0
+    else:
+        ttr = unique_count / word_count
+        
+    if ttr >= 0.9: score_vocab = 10
+    elif ttr >= 0.7: score_vocab = 8
+    elif ttr >= 0.5: score_vocab = 6
+    elif ttr >= 0.3: score_vocab = 4
+    else: score_vocab = 2
+    
+    return {
+        "total_score": score_grammar + score_vocab,
+        "grammar_score": round(score_grammar, 1),
+        "vocab_score": score_vocab,
+        "error_count": error_count,
+        "matches": matches,
+        "ttr": round(ttr, 2)
+    }
+
+def score_clarity(total_words, filler_count):
+    """
+    Weightage: 30% (Assumed Remaining Weight)
+    Metric: Filler Word Rate
+    Formula: (Filler Count / Total Words) * 100
+    List from Excel: um, uh, like, you know, so, actually, basically, right, i mean, well, kinda, sort of, okay, hmm, ah
+    """
+    if total_words == 0:
+        return {"score": 30, "filler_rate": 0, "filler_count": 0}
+            
+    filler_rate = (filler_count / total_words) * 100
+    
+    # Bins (Assumed standard as Excel snippet cut off)
+    # Scaling 10 point scale to 30 points (x3)
+    if filler_rate < 2: 
+        raw_score = 10
+    elif filler_rate < 5: 
+        raw_score = 8
+    elif filler_rate < 9: 
+        raw_score = 6
+    elif filler_rate < 12: 
+        raw_score = 4
+    else: 
+        raw_score = 2
+        
+    final_score = raw_score * 3 # Scale to 30%
+    
+    return {
+        "score": final_score,
+        "filler_rate": round(filler_rate, 2),
+        "filler_count": filler_count
+    }
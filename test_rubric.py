@@ -0,0 +1,83 @@
+import pytest
+
+import rubric
+
+# Expected values below come from the original per-section analyzers
+# (analyze_content_strict, analyze_grammar_strict, ...) on the same input.
+
+CASE_STUDY = """Hello everyone, myself Muskan, studying in class 8th B section from Christ Public School.
+I am 13 years old. I live with my family. There are 3 people in my family, me, my mother and my father.
+One special thing about my family is that they are very kind hearted to everyone and soft spoken. One thing I really enjoy is play, playing cricket and taking wickets.
+A fun fact about me is that I see in mirror and talk by myself. One thing people don't know about me is that I once stole a toy from one of my cousin.
+My favorite subject is science because it is very interesting. Through science I can explore the whole world and make the discoveries and improve the lives of others.
+Thank you for listening."""
+
+
+@pytest.fixture(scope="module")
+def automaton():
+    return rubric.build_automaton()
+
+
+def test_case_study_matches_original_analyzers(automaton):
+    result = rubric.analyze(CASE_STUDY, 52, automaton)
+
+    assert result["content"] == {
+        "total_score": 35.71428571428571,
+        "breakdown": {"Salutation (5)": 5, "Flow (5)": 5, "Keywords (30)": 25.7},
+        "found_sections": ['Name', 'Age', 'Class/School', 'Family', 'Hobbies', 'Unique Point'],
+        "missing_sections": ['Goal'],
+        "is_flow_correct": True,
+    }
+    assert result["grammar"] == {
+        "total_score": 16, "grammar_score": 10, "vocab_score": 6,
+        "error_count": 0, "matches": [], "ttr": 0.68,
+    }
+    assert result["speech"] == {"score": 6, "wpm": 153, "feedback": "Fast (>140 WPM)"}
+    assert result["clarity"] == {"score": 30, "filler_rate": 0.0, "filler_count": 0}
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Unicode punctuation is stripped like re's [^\w\s]
+    ('um… hello there friend ok', {"score": 6, "filler_rate": 20.0, "filler_count": 1}),
+    ('I said “like” it', {"score": 6, "filler_rate": 25.0, "filler_count": 1}),
+    ('ok… right…', {"score": 6, "filler_rate": 50.0, "filler_count": 1}),
+    # Punctuation-only tokens still count as words
+    ('so - um', {"score": 6, "filler_rate": 66.67, "filler_count": 2}),
+    ('', {"score": 30, "filler_rate": 0, "filler_count": 0}),
+])
+def test_clarity_punctuation_matches_original(automaton, text, expected):
+    assert rubric.analyze(text, 60, automaton)["clarity"] == expected
+
+
+@pytest.mark.parametrize("text, filler_count", [
+    ("you know it", 1),
+    ("“you know” it", 1),
+    ("you know, i mean", 2),
+    ("you, know it", 0),
+])
+def test_multi_word_fillers(automaton, text, filler_count):
+    assert rubric.analyze(text, 60, automaton)["clarity"]["filler_count"] == filler_count
+
+
+@pytest.mark.parametrize("text, is_flow_correct", [
+    ("Hi, I am Riya. My name is Riya. Thank you.", True),
+    ("My name is Sam, hello. Thank you.", False),
+    ("um… hello there friend ok", False),
+])
+def test_flow_matches_original(automaton, text, is_flow_correct):
+    assert rubric.analyze(text, 60, automaton)["content"]["is_flow_correct"] is is_flow_correct
+
+
+def test_grammar_formula_uses_checker_matches(automaton):
+    text = " ".join(["word"] * 19 + ["other"])
+    result = rubric.analyze(text, 60, automaton, check_grammar=lambda t: [("Possible typo", "word word")])
+
+    # 1 error in 20 words = 5 per 100 -> (1 - 0.5) * 10
+    assert result["grammar"]["grammar_score"] == 5.0
+    assert result["grammar"]["error_count"] == 1
+    assert result["grammar"]["matches"] == [("Possible typo", "word word")]
+    assert result["grammar"]["ttr"] == 0.1
+
+
+def test_speech_rate_invalid_duration(automaton):
+    assert rubric.analyze(CASE_STUDY, 0, automaton)["speech"] == {"score": 0, "wpm": 0, "feedback": "Invalid"}